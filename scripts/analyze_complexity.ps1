@@ -1,9 +1,10 @@
 # Shell script wrapper for complexity analysis tool
 #
 # Usage:
-#   .\scripts\analyze_complexity.ps1 [directory]
+#   .\scripts\analyze_complexity.ps1 [directory] [options...]
 #
-# If no directory is provided, defaults to src/mvg_departures
+# If no directory is provided, analyzes src/mvg_departures and scripts.
+# Options such as --jobs N or --no-mi are passed on to analyze_complexity.py.
 
 $ErrorActionPreference = "Stop"
 
@@ -19,16 +20,18 @@ Set-Location $PROJECT_ROOT
 # Debug: show argument count and what we received
 Write-Host "DEBUG: analyze_complexity.ps1 called with $($args.Count) arguments: $($args -join ' ')" -ForegroundColor Yellow
 
-# Default to both src/mvg_departures and scripts if no argument provided
-# If argument is provided, use it; otherwise analyze both source and scripts
-if ($args.Count -eq 0) {
+# Default to both src/mvg_departures and scripts if no directory provided
+# If a directory is provided, use it; otherwise analyze both source and scripts
+# Any further arguments are options for the analysis script
+$EXTRA_ARGS = @($args)
+if ($args.Count -eq 0 -or "$($args[0])".StartsWith("-")) {
     # Analyze both source code and scripts
     Write-Host "Analyzing source code and scripts..."
     $sourcePath = Join-Path $PROJECT_ROOT "src\mvg_departures"
     if (-not (Test-Path $sourcePath)) {
         $sourcePath = Join-Path $PROJECT_ROOT "src/mvg_departures"
     }
-    run_python $ANALYZE_SCRIPT $sourcePath
+    run_python $ANALYZE_SCRIPT $sourcePath @EXTRA_ARGS
     if ($LASTEXITCODE -ne 0) {
         exit $LASTEXITCODE
     }
@@ -37,7 +40,7 @@ if ($args.Count -eq 0) {
     Write-Host "SCRIPTS ANALYSIS"
     Write-Host "=================================================================================="
     $scriptsPath = Join-Path $PROJECT_ROOT "scripts"
-    run_python $ANALYZE_SCRIPT $scriptsPath
+    run_python $ANALYZE_SCRIPT $scriptsPath @EXTRA_ARGS
     if ($LASTEXITCODE -ne 0) {
         exit $LASTEXITCODE
     }
@@ -59,6 +62,7 @@ if ($args.Count -eq 0) {
     exit 0
 } else {
     $TARGET_DIR = $args[0]
+    $EXTRA_ARGS = @($args | Select-Object -Skip 1)
 }
 
 # Convert to absolute path if relative
@@ -79,5 +83,5 @@ if (-not (Test-Path $TARGET_DIR)) {
 }
 
 # Run the analysis script (unbuffered output handled by run_python)
-run_python $ANALYZE_SCRIPT $TARGET_DIR
+run_python $ANALYZE_SCRIPT $TARGET_DIR @EXTRA_ARGS
 
@@ -11,17 +11,26 @@ Measures:
 
 from __future__ import annotations
 
+import argparse
 import ast
+import hashlib
+import importlib.metadata
 import json
+import os
+import pickle
 import sys
-from collections.abc import Iterator
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from operator import attrgetter
 from pathlib import Path
 from typing import Any
 
 try:
-    from radon.complexity import cc_visit
-    from radon.metrics import mi_visit
+    from radon.metrics import h_visit_ast, mi_compute
+    from radon.raw import analyze as raw_analyze
+    from radon.visitors import ComplexityVisitor
 
     RADON_AVAILABLE = True
 except ImportError:
@@ -29,14 +38,91 @@ except ImportError:
     print("Warning: radon is not installed. Complexity analysis will be limited.", file=sys.stderr)
     print("Install it with: poetry install --with dev", file=sys.stderr)
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_FILE_NAME = ".complexity_cache.pkl"
+# Fewer uncached files than this are analyzed without starting worker processes
+MIN_FILES_FOR_PROCESS_POOL = 16
+
+# Refactoring thresholds and the priority score weight per unit over each threshold
+MAX_NESTING_LEVEL = 2
+NESTING_WEIGHT = 10
+MAX_COMPLEXITY = 10
+COMPLEXITY_WEIGHT = 2
+MAX_FUNCTION_LENGTH = 50
+LENGTH_WEIGHT = 0.5
+MAX_REGULAR_PARAMETERS = 4
+PARAMETER_WEIGHT = 3
+
+# Maintainability Index bands: below MIN_MAINTAINABLE_MI a function is difficult to
+# maintain, below MIN_DIFFICULT_MI very difficult
+MIN_MAINTAINABLE_MI = 20
+MIN_DIFFICULT_MI = 10
+# MI penalty at an MI of 0, and how much it drops per MI point within each band
+MAX_MI_PENALTY = 10
+VERY_DIFFICULT_MI_WEIGHT = 0.5
+DIFFICULT_MI_WEIGHT = 0.25
+# Penalty when radon could not compute the MI
+UNAVAILABLE_MI_PENALTY = 2.5
+
+# Lowest priority score of the MEDIUM, HIGH and CRITICAL bands; any positive score is LOW
+MEDIUM_PRIORITY_SCORE = 5
+HIGH_PRIORITY_SCORE = 10
+CRITICAL_PRIORITY_SCORE = 20
+
+# Radon cyclomatic complexity by (block name, line number)
+RadonComplexities = dict[tuple[str, int], int]
+
+# Names that are not counted as regular parameters
+IMPLICIT_PARAMETER_NAMES = frozenset({"self", "cls"})
+# Modules a qualified Protocol base may come from
+TYPING_MODULES = frozenset({"typing", "typing_extensions"})
+
+# Exact node types, checked with a set lookup on every visited node
+FUNCTION_TYPES = frozenset({ast.FunctionDef, ast.AsyncFunctionDef})
+CONTROL_FLOW_TYPES = frozenset(
+    {
+        ast.If,
+        ast.For,
+        ast.While,
+        ast.Try,
+        ast.With,
+        ast.AsyncFor,
+        ast.AsyncWith,
+    }
+)
+NESTING_TYPES = CONTROL_FLOW_TYPES | {
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+}
+# Fields holding statement lists; function and class definitions can only appear in these
+STATEMENT_LIST_FIELDS = frozenset({"body", "orelse", "finalbody", "handlers", "cases"})
+
+
+@dataclass(frozen=True)
+class AnalysisOptions:
+    """Options controlling which metrics are computed."""
+
+    include_maintainability_index: bool = True
+
+
+DEFAULT_ANALYSIS_OPTIONS = AnalysisOptions()
+
 
 @dataclass(frozen=True)
 class ProtocolContext:
     """Context information about protocols in a file."""
 
-    protocol_classes: set[str]
-    protocol_implementing_classes: set[str]
-    protocol_signatures: dict[str, set[str]]
+    protocol_classes: dict[str, set[str]]
+    class_base_names: dict[str, frozenset[str]]
     is_protocol_file: bool
 
 
@@ -44,8 +130,9 @@ class ProtocolContext:
 class AnalysisContext:
     """Context for analysis tools (radon, etc.)."""
 
-    radon_results: list[Any]
-    mi_score: float
+    radon_complexities: RadonComplexities
+    # None if the Maintainability Index was skipped
+    mi_score: float | None
 
 
 @dataclass(frozen=True)
@@ -53,12 +140,12 @@ class FileAnalysisContext:
     """Complete context for analyzing a file."""
 
     file_path: Path
-    tree: ast.AST
+    rel_path: str
     protocol_context: ProtocolContext
     analysis_context: AnalysisContext
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionMetrics:
     """Metrics for a single function."""
 
@@ -72,14 +159,24 @@ class FunctionMetrics:
     parameter_count: int
     has_varargs: bool
     has_kwargs: bool
-    maintainability_index: float
+    # 0 if radon could not compute it, None if it was skipped (--no-mi)
+    maintainability_index: float | None
     is_protocol_method: bool = False
-
-    @property
-    def parameter_violation(self) -> int:
+    # Bases of the enclosing class, matched against the protocols of all files after analysis
+    protocol_base_names: frozenset[str] = frozenset()
+    rel_path: str = ""
+    parameter_violation: int = field(init=False)
+    priority_score: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Compute the derived scores once; they are read by every sort, filter and printer."""
+        self.parameter_violation = self._calculate_parameter_violation()
+        self.priority_score = self._calculate_priority_score()
+
+    def _calculate_parameter_violation(self) -> int:
         """Calculate parameter count violation (0 if OK, positive if too many)."""
         # Max allowed: 4 regular params + *args + **kwargs
-        max_allowed = 4
+        max_allowed = MAX_REGULAR_PARAMETERS
         if self.has_varargs:
             max_allowed += 1
         if self.has_kwargs:
@@ -88,39 +185,44 @@ class FunctionMetrics:
 
     def _calculate_nesting_penalty(self) -> float:
         """Calculate penalty for nesting violations."""
-        return max(0, (self.max_nesting_level - 2) * 10)
+        return max(0, (self.max_nesting_level - MAX_NESTING_LEVEL) * NESTING_WEIGHT)
 
     def _calculate_complexity_penalty(self) -> float:
         """Calculate penalty for complexity violations."""
-        return max(0, (self.cyclomatic_complexity - 10) * 2)
+        return max(0, (self.cyclomatic_complexity - MAX_COMPLEXITY) * COMPLEXITY_WEIGHT)
 
     def _calculate_length_penalty(self) -> float:
         """Calculate penalty for function length violations."""
-        return max(0, (self.function_length - 50) * 0.5)
+        return max(0, (self.function_length - MAX_FUNCTION_LENGTH) * LENGTH_WEIGHT)
 
     def _calculate_parameter_penalty(self) -> float:
         """Calculate penalty for parameter count violations."""
-        return self.parameter_violation * 3
+        return self.parameter_violation * PARAMETER_WEIGHT
 
     def _calculate_mi_penalty(self) -> float:
         """Calculate penalty based on Maintainability Index.
         
-        MI ranges from 0-100:
+        MI ranges from 0-100 (default bands):
         - 20-100: Maintainable (no penalty)
         - 10-19: Difficult to maintain (penalty 2.5-5)
         - 0-9: Very difficult to maintain (penalty 5.5-10)
         - 0 or unavailable: Default penalty 2.5
+        - Skipped: No penalty
         """
-        if self.maintainability_index <= 0:
-            return 2.5
-        if self.maintainability_index < 10:
-            return 10 - (self.maintainability_index * 0.5)
-        if self.maintainability_index < 20:
-            return 5 - ((self.maintainability_index - 10) * 0.25)
+        mi = self.maintainability_index
+        if mi is None:
+            return 0.0
+        if mi <= 0:
+            return UNAVAILABLE_MI_PENALTY
+        if mi < MIN_DIFFICULT_MI:
+            return MAX_MI_PENALTY - (mi * VERY_DIFFICULT_MI_WEIGHT)
+        if mi < MIN_MAINTAINABLE_MI:
+            # Continues from the penalty at the upper end of the very difficult band
+            band_start_penalty = MAX_MI_PENALTY - MIN_DIFFICULT_MI * VERY_DIFFICULT_MI_WEIGHT
+            return band_start_penalty - ((mi - MIN_DIFFICULT_MI) * DIFFICULT_MI_WEIGHT)
         return 0.0
 
-    @property
-    def priority_score(self) -> float:
+    def _calculate_priority_score(self) -> float:
         """Calculate priority score for refactoring (higher = more urgent).
         
         Combines penalties from:
@@ -139,39 +241,16 @@ class FunctionMetrics:
         )
 
 
-class NestingLevelVisitor(ast.NodeVisitor):
-    """AST visitor to measure maximum nesting level in a function."""
-
-    def __init__(self) -> None:
-        """Initialize the visitor."""
-        self.max_nesting = 0
-        self.current_nesting = 0
-
-    def visit(self, node: ast.AST) -> None:
-        """Visit a node and track nesting."""
-        # Count nesting for control flow structures
-        if isinstance(
-            node,
-            (
-                ast.If,
-                ast.For,
-                ast.While,
-                ast.Try,
-                ast.With,
-                ast.AsyncFor,
-                ast.AsyncWith,
-                ast.ListComp,
-                ast.SetComp,
-                ast.DictComp,
-                ast.GeneratorExp,
-            ),
-        ):
-            self.current_nesting += 1
-            self.max_nesting = max(self.max_nesting, self.current_nesting)
-            self.generic_visit(node)
-            self.current_nesting -= 1
-        else:
-            self.generic_visit(node)
+@dataclass(slots=True)
+class FileAnalysis:
+    """Function metrics of a file together with the Protocol classes it defines."""
+
+    metrics: list[FunctionMetrics] = field(default_factory=list)
+    protocol_signatures: dict[str, set[str]] = field(default_factory=dict)
+    # Reported by the main process, so workers never write to stderr themselves
+    warnings: list[str] = field(default_factory=list)
+    # Digest of the bytes that were analyzed; None if the file could not be read
+    content_digest: str | None = None
 
 
 def count_parameters(node: ast.FunctionDef | ast.AsyncFunctionDef) -> tuple[int, bool, bool]:
@@ -188,197 +267,157 @@ def count_parameters(node: ast.FunctionDef | ast.AsyncFunctionDef) -> tuple[int,
     
     # Count regular arguments, excluding 'self' and 'cls'
     for arg in args.args:
-        if arg.arg not in ('self', 'cls'):
+        if arg.arg not in IMPLICIT_PARAMETER_NAMES:
             regular_count += 1
     
     return regular_count, has_varargs, has_kwargs
 
 
-def _is_simple_protocol_base(base: ast.AST) -> bool:
-    """Check if base is a simple Protocol name."""
-    return isinstance(base, ast.Name) and base.id == "Protocol"
-
-
-def _is_qualified_protocol_base(base: ast.AST) -> bool:
-    """Check if base is a qualified Protocol (typing.Protocol)."""
-    if not isinstance(base, ast.Attribute):
-        return False
-    if base.attr != "Protocol":
+def _is_protocol_base(base: ast.expr) -> bool:
+    """Check if a base is ``Protocol`` or a qualified ``typing.Protocol``."""
+    base_type = type(base)
+    if base_type is ast.Name:
+        return base.id == "Protocol"
+    if base_type is not ast.Attribute or base.attr != "Protocol":
         return False
-    if not isinstance(base.value, ast.Name):
-        return False
-    return base.value.id in ("typing", "typing_extensions")
+    value = base.value
+    return type(value) is ast.Name and value.id in TYPING_MODULES
 
 
-def is_protocol_class(node: ast.ClassDef, tree: ast.AST) -> bool:
+def is_protocol_class(node: ast.ClassDef) -> bool:
     """Check if a class is a Protocol class."""
     for base in node.bases:
-        if _is_simple_protocol_base(base) or _is_qualified_protocol_base(base):
+        if _is_protocol_base(base):
             return True
     return False
 
 
-def _extract_name_from_base(base: ast.AST) -> str | None:
-    """Extract class name from a base class AST node."""
-    if isinstance(base, ast.Name):
+def _base_name(base: ast.expr) -> str | None:
+    """Extract the class name from a base class node.
+
+    A qualified base such as ``ports.Repository`` contributes its last name part.
+    """
+    base_type = type(base)
+    if base_type is ast.Name:
         return base.id
-    if isinstance(base, ast.Attribute):
+    if base_type is ast.Attribute:
         return base.attr
     return None
 
 
 def get_protocol_base_names(node: ast.ClassDef) -> list[str]:
-    """Get names of Protocol classes that this class inherits from."""
+    """Get the names of the classes this class inherits from."""
     protocol_names = []
     for base in node.bases:
-        name = _extract_name_from_base(base)
-        if name:
+        name = _base_name(base)
+        if name is not None:
             protocol_names.append(name)
     return protocol_names
 
 
-def _node_is_in_class(node: ast.AST, class_node: ast.ClassDef) -> bool:
-    """Check if a node is contained within a class."""
-    for child in ast.walk(class_node):
-        if child is node:
-            return True
-    return False
-
-
-def find_parent_class(node: ast.AST, tree: ast.AST) -> ast.ClassDef | None:
-    """Find the parent class of a node."""
-    for class_node in ast.walk(tree):
-        if isinstance(class_node, ast.ClassDef) and _node_is_in_class(node, class_node):
-            return class_node
-    return None
-
-
 def is_protocol_file_path(file_path: Path) -> bool:
     """Check if file path suggests it's a protocol/contract file."""
     name_lower = file_path.name.lower()
     return "protocol" in name_lower or "contracts" in name_lower or "ports" in name_lower
 
 
-def _add_protocol_to_signatures(
-    protocol_node: ast.ClassDef, protocol_signatures: dict[str, set[str]]
-) -> None:
-    """Add protocol class methods to signatures if not already present."""
-    if protocol_node.name not in protocol_signatures:
-        method_names = {
-            child.name
-            for child in ast.walk(protocol_node)
-            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
-        }
-        protocol_signatures[protocol_node.name] = method_names
-
-
-def collect_protocol_classes_from_file(
-    tree: ast.AST, protocol_signatures: dict[str, set[str]]
-) -> set[str]:
-    """Collect Protocol classes defined in this file."""
-    protocol_classes: set[str] = set()
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef) and is_protocol_class(node, tree):
-            protocol_classes.add(node.name)
-            _add_protocol_to_signatures(node, protocol_signatures)
-    return protocol_classes
-
-
-def _class_implements_protocol(
-    class_node: ast.ClassDef, protocol_classes: set[str], protocol_signatures: dict[str, set[str]]
-) -> bool:
-    """Check if a class implements any known protocol."""
-    base_names = get_protocol_base_names(class_node)
-    return any(
-        base_name in protocol_classes or base_name in protocol_signatures
-        for base_name in base_names
-    )
+def _extract_method_names_from_protocol(protocol_node: ast.ClassDef) -> set[str]:
+    """Extract the names of the methods defined in a Protocol class node.
 
+    Conditional blocks such as ``if TYPE_CHECKING:`` are followed, so methods declared
+    in them still count. Method bodies and nested classes are not entered, as functions
+    defined there are no methods of the protocol. Only statement lists are followed,
+    so expressions are never entered either.
+    """
+    method_names = set()
+    stack = list(protocol_node.body)
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type in FUNCTION_TYPES:
+            method_names.add(node.name)
+            continue
+        if node_type is ast.ClassDef:
+            continue
+        for name in STATEMENT_LIST_FIELDS:
+            stack.extend(getattr(node, name, ()))
+    return method_names
 
-def find_protocol_implementing_classes(
-    tree: ast.AST, protocol_classes: set[str], protocol_signatures: dict[str, set[str]]
-) -> set[str]:
-    """Find classes that implement protocols."""
-    implementing_classes: set[str] = set()
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef) and _class_implements_protocol(
-            node, protocol_classes, protocol_signatures
-        ):
-            implementing_classes.add(node.name)
-    return implementing_classes
 
+def collect_protocol_classes_from_file(class_nodes: list[ast.ClassDef]) -> dict[str, set[str]]:
+    """Collect Protocol classes defined in this file with their method names.
 
-def _is_protocol_class_method(parent_class: ast.ClassDef, protocol_context: ProtocolContext) -> bool:
-    """Check if parent class is a protocol class."""
-    return parent_class.name in protocol_context.protocol_classes
+    A later definition of the same name replaces an earlier one.
+    """
+    protocols: dict[str, set[str]] = {}
+    for node in class_nodes:
+        if is_protocol_class(node):
+            protocols[node.name] = _extract_method_names_from_protocol(node)
+    return protocols
 
 
-def _is_protocol_implementation_method(
-    func_name: str, parent_class: ast.ClassDef, protocol_context: ProtocolContext
-) -> bool:
-    """Check if function is implementing a protocol method."""
-    if parent_class.name not in protocol_context.protocol_implementing_classes:
-        return False
-    return any(
-        func_name in method_names
-        for method_names in protocol_context.protocol_signatures.values()
-    )
+def collect_class_base_names(class_nodes: list[ast.ClassDef]) -> dict[str, frozenset[str]]:
+    """Map each class name to the base names of all classes defined under that name."""
+    base_names: dict[str, set[str]] = {}
+    for node in class_nodes:
+        base_names.setdefault(node.name, set()).update(get_protocol_base_names(node))
+    return {name: frozenset(names) for name, names in base_names.items()}
 
 
 def check_if_protocol_method(
-    func_node: ast.FunctionDef | ast.AsyncFunctionDef,
-    parent_class: ast.ClassDef | None,
-    protocol_context: ProtocolContext,
+    parent_class: ast.ClassDef | None, protocol_context: ProtocolContext
 ) -> bool:
-    """Check if a function is a protocol method."""
+    """Check if a function is a protocol method based on its own file.
+
+    Methods implementing a protocol are only known once the protocols of every file
+    have been collected; see resolve_protocol_methods.
+    """
     if not parent_class:
         return protocol_context.is_protocol_file
-    
-    if _is_protocol_class_method(parent_class, protocol_context):
-        return True
-    
-    func_name = func_node.name
-    return _is_protocol_implementation_method(func_name, parent_class, protocol_context)
+    return parent_class.name in protocol_context.protocol_classes
 
 
-def _find_radon_complexity(
-    func_name: str, line_start: int, radon_results: list[Any]
-) -> int | None:
-    """Find cyclomatic complexity from radon results."""
-    if not RADON_AVAILABLE:
-        return None
-    for radon_func in radon_results:
-        if radon_func.name == func_name and radon_func.lineno == line_start:
-            return radon_func.complexity
-    return None
+def get_pending_protocol_base_names(
+    parent_class: ast.ClassDef | None, protocol_context: ProtocolContext
+) -> frozenset[str]:
+    """Get the base names a method's class may implement a protocol through."""
+    if not parent_class or parent_class.name in protocol_context.protocol_classes:
+        return frozenset()
+    return protocol_context.class_base_names[parent_class.name]
 
 
-def _estimate_complexity_from_ast(func_node: ast.FunctionDef | ast.AsyncFunctionDef) -> int:
-    """Estimate complexity by counting control flow nodes."""
-    control_flow_types = (
-        ast.If,
-        ast.For,
-        ast.While,
-        ast.Try,
-        ast.With,
-        ast.AsyncFor,
-        ast.AsyncWith,
-    )
-    control_flow_count = sum(1 for n in ast.walk(func_node) if isinstance(n, control_flow_types))
-    return 1 + control_flow_count
+def resolve_protocol_methods(
+    metrics: list[FunctionMetrics], protocol_signatures: dict[str, set[str]]
+) -> None:
+    """Mark methods implementing a protocol, now that all protocol signatures are known."""
+    protocol_method_names: set[str] = set().union(*protocol_signatures.values())
+    for metric in metrics:
+        if metric.protocol_base_names:
+            metric.is_protocol_method = (
+                metric.function_name in protocol_method_names
+                and not metric.protocol_base_names.isdisjoint(protocol_signatures)
+            )
+
+
+def _index_radon_results(radon_results: list[Any]) -> RadonComplexities:
+    """Index radon blocks by (name, lineno), keeping the first block for duplicate keys."""
+    radon_complexities: RadonComplexities = {}
+    for block in radon_results:
+        radon_complexities.setdefault((block.name, block.lineno), block.complexity)
+    return radon_complexities
 
 
 def get_cyclomatic_complexity(
-    func_node: ast.FunctionDef | ast.AsyncFunctionDef,
     func_name: str,
     line_start: int,
-    radon_results: list[Any],
+    radon_complexities: RadonComplexities,
+    estimated_complexity: int,
 ) -> int:
-    """Get cyclomatic complexity for a function."""
-    radon_complexity = _find_radon_complexity(func_name, line_start, radon_results)
+    """Get cyclomatic complexity for a function, falling back to the AST estimate."""
+    radon_complexity = radon_complexities.get((func_name, line_start))
     if radon_complexity is not None:
         return radon_complexity
-    return _estimate_complexity_from_ast(func_node)
+    return estimated_complexity
 
 
 def _extract_function_bounds(func_node: ast.FunctionDef | ast.AsyncFunctionDef) -> tuple[int, int]:
@@ -388,33 +427,146 @@ def _extract_function_bounds(func_node: ast.FunctionDef | ast.AsyncFunctionDef)
     return line_start, line_end
 
 
-def _calculate_max_nesting(func_node: ast.FunctionDef | ast.AsyncFunctionDef) -> int:
-    """Calculate maximum nesting level for a function."""
-    visitor = NestingLevelVisitor()
-    visitor.visit(func_node)
-    return visitor.max_nesting
+@dataclass(slots=True)
+class _FunctionFrame:
+    """Traversal state for a function while collect_functions_and_classes walks its body."""
+
+    node: ast.FunctionDef | ast.AsyncFunctionDef
+    parent_class: ast.ClassDef | None
+    base_depth: int
+    max_depth: int
+    control_flow_count: int = 0
+
+
+# Stack marker for leaving a function, pushed below the function's children
+_FUNCTION_END = None
+
+
+# Stack entries: (node, nesting depth, outermost enclosing class)
+_StackEntry = tuple[ast.AST | None, int, ast.ClassDef | None]
 
 
-def analyze_function_node(
-    func_node: ast.FunctionDef | ast.AsyncFunctionDef,
-    context: FileAnalysisContext,
-) -> FunctionMetrics:
-    """Analyze a single function node and return metrics."""
+def _push_field(
+    value: Any, depth: int, outer_class: ast.ClassDef | None, stack: list[_StackEntry]
+) -> None:
+    """Push a field's child node, or the nodes of a list field with the last one first."""
+    if type(value) is list:
+        stack.extend(
+            [(item, depth, outer_class) for item in reversed(value) if isinstance(item, ast.AST)]
+        )
+    elif isinstance(value, ast.AST):
+        stack.append((value, depth, outer_class))
+
+
+def _push_children(
+    node: ast.AST, depth: int, outer_class: ast.ClassDef | None, stack: list[_StackEntry]
+) -> None:
+    """Push a node's children so they are popped in source order.
+
+    Reads ``_fields`` directly; ``ast.iter_child_nodes`` plus reversing is ~2.5x slower.
+    List fields created by the parser are always plain lists, so an exact type check is
+    enough for them.
+    """
+    for name in reversed(node._fields):
+        _push_field(getattr(node, name, None), depth, outer_class, stack)
+
+
+def _push_statements(
+    node: ast.AST, depth: int, outer_class: ast.ClassDef | None, stack: list[_StackEntry]
+) -> None:
+    """Push only a node's statement lists, so they are popped in source order.
+
+    Outside of functions nothing but further function and class definitions matters,
+    and those are statements, so expressions are skipped without being visited.
+    """
+    stack.extend(
+        [
+            (item, depth, outer_class)
+            for name in reversed(node._fields)
+            if name in STATEMENT_LIST_FIELDS
+            for item in reversed(getattr(node, name))
+        ]
+    )
+
+
+def _enter_function(
+    node: ast.FunctionDef | ast.AsyncFunctionDef,
+    depth: int,
+    outer_class: ast.ClassDef | None,
+    stack: list[_StackEntry],
+) -> _FunctionFrame:
+    """Open a frame for a function, pushing its end marker below the children to come."""
+    stack.append((_FUNCTION_END, depth, outer_class))
+    return _FunctionFrame(node=node, parent_class=outer_class, base_depth=depth, max_depth=depth)
+
+
+def _count_nesting(frames: list[_FunctionFrame], node_type: type, depth: int) -> None:
+    """Record a nesting node on the innermost enclosing function, if there is one."""
+    if not frames:
+        return
+    frame = frames[-1]
+    frame.max_depth = max(frame.max_depth, depth)
+    if node_type in CONTROL_FLOW_TYPES:
+        frame.control_flow_count += 1
+
+
+def collect_functions_and_classes(
+    tree: ast.AST,
+) -> tuple[list[_FunctionFrame], list[ast.ClassDef]]:
+    """Walk a module once, collecting every function's frame and every class definition.
+
+    Uses an explicit stack instead of recursive visitor dispatch, so deeply nested code
+    cannot hit the recursion limit. Nesting and the control-flow count (the fallback
+    complexity estimate) are scoped to each function: nodes inside a nested function
+    only count toward that function, which is reported on its own, just as radon leaves
+    closures out of the enclosing function's complexity. Each function also records its
+    outermost enclosing class, which decides whether it counts as a protocol method.
+    Functions and classes are returned in source order. Module and class level
+    expressions are not visited.
+    """
+    functions: list[_FunctionFrame] = []
+    classes: list[ast.ClassDef] = []
+    frames: list[_FunctionFrame] = []
+    stack: list[_StackEntry] = [(tree, 0, None)]
+    while stack:
+        node, depth, outer_class = stack.pop()
+        if node is _FUNCTION_END:
+            frames.pop()
+            continue
+        # The node type sets are disjoint, so at most one of these branches applies
+        node_type = type(node)
+        if node_type in FUNCTION_TYPES:
+            frames.append(_enter_function(node, depth, outer_class, stack))
+            functions.append(frames[-1])
+        if node_type is ast.ClassDef:
+            classes.append(node)
+            outer_class = outer_class or node
+        if node_type in NESTING_TYPES:
+            depth += 1
+            _count_nesting(frames, node_type, depth)
+        push = _push_children if frames else _push_statements
+        push(node, depth, outer_class, stack)
+    return functions, classes
+
+
+def analyze_function_node(frame: _FunctionFrame, context: FileAnalysisContext) -> FunctionMetrics:
+    """Build metrics for a function from the values gathered by collect_functions_and_classes."""
+    func_node = frame.node
     func_name = func_node.name
     line_start, line_end = _extract_function_bounds(func_node)
     function_length = line_end - line_start + 1
     
-    parent_class = find_parent_class(func_node, context.tree)
-    is_protocol_method = check_if_protocol_method(
-        func_node,
-        parent_class,
-        context.protocol_context,
+    is_protocol_method = check_if_protocol_method(frame.parent_class, context.protocol_context)
+    protocol_base_names = get_pending_protocol_base_names(
+        frame.parent_class, context.protocol_context
     )
     
-    max_nesting = _calculate_max_nesting(func_node)
     param_count, has_varargs, has_kwargs = count_parameters(func_node)
     cyclomatic_complexity = get_cyclomatic_complexity(
-        func_node, func_name, line_start, context.analysis_context.radon_results
+        func_name,
+        line_start,
+        context.analysis_context.radon_complexities,
+        estimated_complexity=1 + frame.control_flow_count,
     )
     
     return FunctionMetrics(
@@ -423,122 +575,466 @@ def analyze_function_node(
         line_start=line_start,
         line_end=line_end,
         cyclomatic_complexity=cyclomatic_complexity,
-        max_nesting_level=max_nesting,
+        max_nesting_level=frame.max_depth - frame.base_depth,
         function_length=function_length,
         parameter_count=param_count,
         has_varargs=has_varargs,
         has_kwargs=has_kwargs,
-        maintainability_index=float(context.analysis_context.mi_score),
+        maintainability_index=context.analysis_context.mi_score,
         is_protocol_method=is_protocol_method,
+        protocol_base_names=protocol_base_names,
+        rel_path=context.rel_path,
     )
 
 
-def get_radon_metrics(source_code: str, file_path: Path) -> tuple[list[Any], float]:
-    """Get radon metrics if available."""
-    radon_results: list[Any] = []
-    mi_score = 0.0
+def _compute_maintainability_index(
+    source_code: str, tree: ast.AST, total_complexity: int
+) -> float:
+    """Compute the multi-line Maintainability Index from an already-parsed tree.
+
+    Mirrors radon's ``mi_visit(source_code, multi=True)`` without re-parsing the source.
+    """
+    raw = raw_analyze(source_code)
+    comment_lines = raw.comments + raw.multi
+    comments = comment_lines / float(raw.sloc) * 100 if raw.sloc != 0 else 0
+    return mi_compute(h_visit_ast(tree).total.volume, total_complexity, raw.lloc, comments)
+
+
+def get_radon_metrics(
+    source_code: str, tree: ast.AST, file_path: Path, options: AnalysisOptions
+) -> tuple[RadonComplexities, float | None, list[str]]:
+    """Get radon metrics if available, reusing the already-parsed tree.
+
+    The Maintainability Index needs radon's token-based raw metrics, which dominate the
+    per-file cost, so it is only computed when the options ask for it; otherwise the
+    returned MI is None.
+
+    Returns:
+        Tuple of (radon_complexities, mi_score, warnings)
+    """
+    radon_complexities: RadonComplexities = {}
+    mi_score = 0.0 if options.include_maintainability_index else None
     
     if not RADON_AVAILABLE:
-        return radon_results, mi_score
+        return radon_complexities, mi_score, []
     
     try:
-        radon_results = cc_visit(source_code)
+        complexity_visitor = ComplexityVisitor.from_ast(tree)
+        radon_complexities = _index_radon_results(complexity_visitor.blocks)
     except Exception as e:
-        print(f"Warning: Radon error for {file_path}: {e}", file=sys.stderr)
+        return radon_complexities, mi_score, [f"Warning: Radon error for {file_path}: {e}"]
+    
+    if not options.include_maintainability_index:
+        return radon_complexities, mi_score, []
     
     try:
-        mi_result = mi_visit(source_code, multi=True)
-        mi_score = mi_result[1] if isinstance(mi_result, tuple) else mi_result
+        mi_score = _compute_maintainability_index(
+            source_code, tree, complexity_visitor.total_complexity
+        )
     except Exception:
         pass
     
-    return radon_results, mi_score
+    return radon_complexities, mi_score, []
+
 
+def analyze_file(
+    file_path: Path, options: AnalysisOptions = DEFAULT_ANALYSIS_OPTIONS
+) -> FileAnalysis:
+    """Analyze a Python file and return its function metrics and Protocol classes.
 
-def analyze_file(file_path: Path, protocol_signatures: dict[str, set[str]] | None = None) -> list[FunctionMetrics]:
-    """Analyze a Python file and return function metrics."""
+    The file is read once: the digest of the same bytes is returned with the analysis,
+    so the cache entry matches exactly the content that was analyzed.
+    """
     try:
-        source_code = file_path.read_text(encoding="utf-8")
+        content = file_path.read_bytes()
+        # Translate newlines as reading in text mode would
+        source_code = content.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
     except Exception as e:
-        print(f"Warning: Could not read {file_path}: {e}", file=sys.stderr)
-        return []
+        return FileAnalysis(warnings=[f"Warning: Could not read {file_path}: {e}"])
+    analysis = _analyze_source(source_code, file_path, options)
+    analysis.content_digest = _bytes_digest(content)
+    return analysis
+
+
+def _build_file_context(
+    file_path: Path,
+    protocol_classes: dict[str, set[str]],
+    classes: list[ast.ClassDef],
+    analysis_context: AnalysisContext,
+) -> FileAnalysisContext:
+    """Build the context shared by all functions of a file."""
+    protocol_context = ProtocolContext(
+        protocol_classes=protocol_classes,
+        class_base_names=collect_class_base_names(classes),
+        is_protocol_file=is_protocol_file_path(file_path),
+    )
+    return FileAnalysisContext(
+        file_path=file_path,
+        rel_path=str(_get_relative_path(str(file_path), PROJECT_ROOT)),
+        protocol_context=protocol_context,
+        analysis_context=analysis_context,
+    )
+
+
+def _analyze_source(source_code: str, file_path: Path, options: AnalysisOptions) -> FileAnalysis:
+    """Analyze the decoded source code of a Python file."""
+    # Without a def or a Protocol base there is nothing to collect; skip parsing
+    if "def" not in source_code and "Protocol" not in source_code:
+        return FileAnalysis()
 
     try:
         tree = ast.parse(source_code, filename=str(file_path))
     except SyntaxError as e:
-        print(f"Warning: Syntax error in {file_path}: {e}", file=sys.stderr)
-        return []
+        return FileAnalysis(warnings=[f"Warning: Syntax error in {file_path}: {e}"])
 
-    if protocol_signatures is None:
-        protocol_signatures = {}
-    
-    is_protocol_file = is_protocol_file_path(file_path)
-    protocol_classes = collect_protocol_classes_from_file(tree, protocol_signatures)
-    protocol_implementing_classes = find_protocol_implementing_classes(
-        tree, protocol_classes, protocol_signatures
+    functions, classes = collect_functions_and_classes(tree)
+    # Every Protocol base spells out the name, so most files can skip the class scan
+    protocol_classes = (
+        collect_protocol_classes_from_file(classes) if "Protocol" in source_code else {}
     )
+    if not functions:
+        return FileAnalysis(protocol_signatures=protocol_classes)
     
-    radon_results, mi_score = get_radon_metrics(source_code, file_path)
+    radon_complexities, mi_score, warnings = get_radon_metrics(
+        source_code, tree, file_path, options
+    )
+    file_context = _build_file_context(
+        file_path,
+        protocol_classes,
+        classes,
+        AnalysisContext(radon_complexities=radon_complexities, mi_score=mi_score),
+    )
     
-    protocol_context = ProtocolContext(
-        protocol_classes=protocol_classes,
-        protocol_implementing_classes=protocol_implementing_classes,
-        protocol_signatures=protocol_signatures,
-        is_protocol_file=is_protocol_file,
+    return FileAnalysis(
+        metrics=[analyze_function_node(frame, file_context) for frame in functions],
+        protocol_signatures=protocol_classes,
+        warnings=warnings,
     )
-    analysis_context = AnalysisContext(
-        radon_results=radon_results,
-        mi_score=mi_score,
+
+
+@dataclass(slots=True)
+class CachedFileAnalysis:
+    """Analysis of a file together with the file state it was computed from."""
+
+    mtime_ns: int
+    size: int
+    content_digest: str
+    analysis: FileAnalysis
+
+
+MetricsCache = dict[str, CachedFileAnalysis]
+
+
+def _file_state(file_path: Path) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) of a file, or None if it cannot be stat'ed."""
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _bytes_digest(content: bytes) -> str:
+    """Hash file contents."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _content_digest(file_path: Path) -> str | None:
+    """Hash the file contents, or return None if the file cannot be read."""
+    try:
+        return _bytes_digest(file_path.read_bytes())
+    except OSError:
+        return None
+
+
+def _radon_version() -> str | None:
+    """Return the installed radon version, or None if it cannot be determined."""
+    if not RADON_AVAILABLE:
+        return None
+    try:
+        return importlib.metadata.version("radon")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _analyzer_fingerprint() -> tuple[Any, ...]:
+    """Identify the analyzer build so cached metrics are dropped when the tool itself changes.
+
+    Complexity and MI values come from radon and the interpreter's AST, so upgrading
+    either also invalidates the cache.
+    """
+    return (
+        _content_digest(Path(__file__)),
+        RADON_AVAILABLE,
+        _radon_version(),
+        sys.version_info[:2],
     )
-    file_context = FileAnalysisContext(
-        file_path=file_path,
-        tree=tree,
-        protocol_context=protocol_context,
-        analysis_context=analysis_context,
+
+
+@dataclass(frozen=True)
+class CacheScope:
+    """Everything besides a file's own content that its cached metrics depend on."""
+
+    root_dir: Path
+    options: AnalysisOptions
+
+
+def load_metrics_cache(cache_path: Path, scope: CacheScope) -> MetricsCache:
+    """Load cached per-file analyses for a root directory.
+
+    Entries are only reused if they were produced by the same analyzer with the same
+    options, since these influence the metrics of every file.
+    """
+    try:
+        with cache_path.open("rb") as f:
+            cache_data = pickle.load(f)
+        root_entry = cache_data["roots"][str(scope.root_dir.resolve())]
+    except Exception:
+        return {}
+    if cache_data.get("analyzer") != _analyzer_fingerprint():
+        return {}
+    if root_entry.get("options") != scope.options:
+        return {}
+    return root_entry["files"]
+
+
+def save_metrics_cache(
+    cache_path: Path,
+    scope: CacheScope,
+    file_metrics: MetricsCache,
+) -> None:
+    """Store per-file analyses for a root directory, keeping entries of other roots."""
+    analyzer = _analyzer_fingerprint()
+    try:
+        with cache_path.open("rb") as f:
+            cache_data = pickle.load(f)
+        if cache_data.get("analyzer") != analyzer:
+            cache_data = None
+    except Exception:
+        cache_data = None
+    if cache_data is None:
+        cache_data = {"analyzer": analyzer, "roots": {}}
+
+    cache_data["roots"][str(scope.root_dir.resolve())] = {
+        "options": scope.options,
+        "files": file_metrics,
+    }
+    try:
+        with cache_path.open("wb") as f:
+            pickle.dump(cache_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Warning: Could not write cache {cache_path}: {e}", file=sys.stderr)
+
+
+def _analyze_uncached_files(
+    py_files: list[Path], options: AnalysisOptions, jobs: int | None = None
+) -> list[FileAnalysis]:
+    """Analyze files in worker processes, returning results in input order.
+
+    Parsing and visiting are CPU-bound and hold the GIL, so processes rather than threads.
+    Each worker gets about four chunks, enough to balance uneven file sizes while keeping
+    the per-task pickling overhead low. A handful of files is analyzed in-process, as
+    starting the workers would cost more than it saves. At most ``jobs`` workers are
+    used (default: one per CPU); ``jobs=1`` keeps everything in-process.
+    """
+    analyze = partial(analyze_file, options=options)
+    workers = min(jobs or os.cpu_count() or 1, len(py_files))
+    if workers <= 1 or len(py_files) < MIN_FILES_FOR_PROCESS_POOL:
+        return [analyze(py_file) for py_file in py_files]
+    chunksize = max(1, len(py_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze, py_files, chunksize=chunksize))
+
+
+def _reuse_cached_entry(
+    file_path: Path, state: tuple[int, int] | None, entry: CachedFileAnalysis | None
+) -> CachedFileAnalysis | None:
+    """Return the cache entry if the file is unchanged, otherwise None.
+
+    A differing mtime alone (e.g. after a git checkout) falls back to comparing the
+    content digest, and the entry's mtime is refreshed when the content still matches.
+    """
+    if entry is None or state is None:
+        return None
+    mtime_ns, size = state
+    if entry.mtime_ns == mtime_ns and entry.size == size:
+        return entry
+    if entry.size != size or _content_digest(file_path) != entry.content_digest:
+        return None
+    entry.mtime_ns = mtime_ns
+    return entry
+
+
+def _new_cache_entry(
+    state: tuple[int, int] | None, analysis: FileAnalysis
+) -> CachedFileAnalysis | None:
+    """Record a fresh analysis with the file state captured before the file was analyzed.
+
+    A concurrent edit then leaves a stale mtime, so the next run compares digests and
+    only reuses the entry if the analyzed content is still current.
+    """
+    if state is None or analysis.content_digest is None:
+        return None
+    mtime_ns, size = state
+    return CachedFileAnalysis(
+        mtime_ns=mtime_ns, size=size, content_digest=analysis.content_digest, analysis=analysis
     )
-    
-    metrics: list[FunctionMetrics] = []
-    for node in ast.walk(tree):
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            metric = analyze_function_node(node, file_context)
-            metrics.append(metric)
 
-    return metrics
+
+def _analyze_cache_misses(
+    py_files: list[Path],
+    entries: list[CachedFileAnalysis | None],
+    options: AnalysisOptions,
+    jobs: int | None,
+) -> list[FileAnalysis]:
+    """Return every file's analysis, analyzing only the files without a reusable entry."""
+    missing = [py_file for py_file, entry in zip(py_files, entries, strict=True) if entry is None]
+    fresh = iter(_analyze_uncached_files(missing, options, jobs))
+    return [next(fresh) if entry is None else entry.analysis for entry in entries]
+
+
+def _build_updated_cache(
+    py_files: list[Path],
+    states: list[tuple[int, int] | None],
+    entries: list[CachedFileAnalysis | None],
+    analyses: list[FileAnalysis],
+) -> MetricsCache:
+    """Combine reused entries with entries for fresh analyses.
+
+    Only files seen in this run are kept, so entries for deleted files are dropped.
+    """
+    updated_cache: MetricsCache = {}
+    for py_file, state, entry, analysis in zip(py_files, states, entries, analyses, strict=True):
+        entry = entry or _new_cache_entry(state, analysis)
+        if entry is not None:
+            updated_cache[str(py_file)] = entry
+    return updated_cache
+
+
+def _merge_analyses(
+    analyses: list[FileAnalysis],
+) -> tuple[list[FunctionMetrics], dict[str, set[str]]]:
+    """Merge metrics and protocol signatures in file order, writing warnings to stderr at once."""
+    all_metrics: list[FunctionMetrics] = []
+    protocol_signatures: dict[str, set[str]] = {}
+    warnings: list[str] = []
+    for analysis in analyses:
+        all_metrics.extend(analysis.metrics)
+        protocol_signatures.update(analysis.protocol_signatures)
+        warnings.extend(analysis.warnings)
+    if warnings:
+        sys.stderr.write("\n".join(warnings) + "\n")
+    return all_metrics, protocol_signatures
+
+
+def analyze_files(
+    py_files: Iterable[Path],
+    scope: CacheScope,
+    cache: MetricsCache,
+    jobs: int | None = None,
+) -> tuple[list[FunctionMetrics], dict[str, set[str]], MetricsCache]:
+    """Analyze files, reusing cached analyses for files unchanged since the last run.
+
+    Every file is parsed at most once: the Protocol classes it defines are returned
+    alongside its metrics and merged here, in file order, into the signatures of all
+    protocols under the root. Warnings, including those of cached files, are written to
+    stderr in file order with a single write.
+
+    Returns:
+        Tuple of (all_metrics, protocol_signatures, updated_cache)
+    """
+    py_files = list(py_files)
+    # Capture file state before analyzing, so a concurrent edit invalidates the entry
+    states = [_file_state(py_file) for py_file in py_files]
+    entries = [
+        _reuse_cached_entry(py_file, state, cache.get(str(py_file)))
+        for py_file, state in zip(py_files, states, strict=True)
+    ]
+    analyses = _analyze_cache_misses(py_files, entries, scope.options, jobs)
+    all_metrics, protocol_signatures = _merge_analyses(analyses)
+    return all_metrics, protocol_signatures, _build_updated_cache(
+        py_files, states, entries, analyses
+    )
+
+
+# File at the root of every virtual environment; such directories are not scanned
+VIRTUAL_ENVIRONMENT_MARKER = "pyvenv.cfg"
+# Directories that never hold project sources; pruned before descending into them
+EXCLUDED_DIRECTORIES = frozenset(
+    {
+        "__pycache__",
+        ".git",
+        ".hg",
+        ".venv",
+        ".tox",
+        ".nox",
+        "node_modules",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+    }
+)
+
+
+def _is_scanned_directory(entry: os.DirEntry[str]) -> bool:
+    """Check if a directory entry is a subdirectory to descend into."""
+    return entry.is_dir(follow_symlinks=False) and entry.name not in EXCLUDED_DIRECTORIES
+
+
+def _is_analyzed_file(entry: os.DirEntry[str]) -> bool:
+    """Check if a directory entry is a Python file to analyze."""
+    # Skip test files for now (can be included later)
+    return (
+        entry.name.endswith(".py")
+        and "test_" not in entry.name
+        and not entry.is_dir(follow_symlinks=False)
+    )
+
+
+def _scan_directory(directory: str) -> tuple[list[str], list[str]]:
+    """List Python files and subdirectories of a directory, skipping excluded dirs and tests.
+
+    Uses the entry type cached by os.scandir, so no extra stat call is made per entry.
+    A virtual environment is recognized by the ``pyvenv.cfg`` in its own listing rather
+    than by name, as ``venv`` or ``env`` may just as well be regular packages, and
+    yields nothing.
+    """
+    try:
+        with os.scandir(directory) as scanned:
+            entries = list(scanned)
+    except OSError:
+        return [], []
+    if any(entry.name == VIRTUAL_ENVIRONMENT_MARKER for entry in entries):
+        return [], []
+    python_files = [entry.path for entry in entries if _is_analyzed_file(entry)]
+    subdirectories = [entry.path for entry in entries if _is_scanned_directory(entry)]
+    return python_files, subdirectories
 
 
 def find_python_files(root_dir: Path) -> Iterator[Path]:
-    """Find all Python files in the source directory."""
-    for path in root_dir.rglob("*.py"):
-        # Skip __pycache__ and test files for now (can be included later)
-        if "__pycache__" not in str(path) and "test_" not in path.name:
-            yield path
+    """Find all Python files in the source directory.
+
+    Walks depth-first, yielding each directory's files before descending into it.
+    """
+    pending = [os.fspath(root_dir)]
+    while pending:
+        python_files, subdirectories = _scan_directory(pending.pop())
+        for file_path in python_files:
+            yield Path(file_path)
+        pending.extend(reversed(subdirectories))
+
+
+PRIORITY_LABELS = ("✅ OK", "🟢 LOW", "🟡 MEDIUM", "🟠 HIGH", "🔴 CRITICAL")
 
 
 def format_priority(score: float) -> str:
     """Format priority score as a string."""
-    if score >= 20:
-        return "🔴 CRITICAL"
-    if score >= 10:
-        return "🟠 HIGH"
-    if score >= 5:
-        return "🟡 MEDIUM"
-    if score > 0:
-        return "🟢 LOW"
-    return "✅ OK"
-
-
-def _prepare_metrics_with_paths(
-    top_metrics: list[FunctionMetrics], limit: int, project_root: Path
-) -> list[tuple[Path, FunctionMetrics]]:
-    """Prepare metrics with relative paths."""
-    metrics_with_paths = []
-    for m in top_metrics[:limit]:
-        try:
-            rel_path = Path(m.file_path).relative_to(project_root)
-        except ValueError:
-            rel_path = Path(m.file_path)
-        metrics_with_paths.append((rel_path, m))
-    return metrics_with_paths
+    return PRIORITY_LABELS[
+        (score > 0)
+        + (score >= MEDIUM_PRIORITY_SCORE)
+        + (score >= HIGH_PRIORITY_SCORE)
+        + (score >= CRITICAL_PRIORITY_SCORE)
+    ]
 
 
 def _get_default_column_widths() -> dict[str, int]:
@@ -555,26 +1051,25 @@ def _get_default_column_widths() -> dict[str, int]:
     }
 
 
-def _calculate_dynamic_column_widths(
-    metrics_with_paths: list[tuple[Path, FunctionMetrics]]
-) -> dict[str, int]:
-    """Calculate dynamic column widths based on content."""
-    max_file_len = min(max(len(str(p)) for p, _ in metrics_with_paths), 50)
-    max_func_len = min(max(len(m.function_name) for _, m in metrics_with_paths), 30)
+def _calculate_dynamic_column_widths(metrics: list[FunctionMetrics]) -> dict[str, int]:
+    """Calculate dynamic column widths based on content, in a single pass."""
+    max_file_len = 0
+    max_func_len = 0
+    for m in metrics:
+        max_file_len = max(max_file_len, len(m.rel_path))
+        max_func_len = max(max_func_len, len(m.function_name))
     
     widths = _get_default_column_widths()
-    widths['file'] = max_file_len + 2
-    widths['function'] = max_func_len + 2
+    widths['file'] = min(max_file_len, 50) + 2
+    widths['function'] = min(max_func_len, 30) + 2
     return widths
 
 
-def _calculate_column_widths(
-    metrics_with_paths: list[tuple[Path, FunctionMetrics]]
-) -> dict[str, int]:
+def _calculate_column_widths(metrics: list[FunctionMetrics]) -> dict[str, int]:
     """Calculate column widths for table formatting."""
-    if not metrics_with_paths:
+    if not metrics:
         return _get_default_column_widths()
-    return _calculate_dynamic_column_widths(metrics_with_paths)
+    return _calculate_dynamic_column_widths(metrics)
 
 
 def _format_table_header(col_widths: dict[str, int]) -> str:
@@ -610,89 +1105,57 @@ def _truncate_string(text: str, max_len: int) -> str:
     return "..." + text[-(max_len - 3):]
 
 
+def _build_row_template(col_widths: dict[str, int]) -> str:
+    """Build the str.format template for table rows, with the column widths filled in."""
+    return (
+        f"{{:<{col_widths['priority']}}} "
+        f"{{:<{col_widths['file']}}} "
+        f"{{:<{col_widths['function']}}} "
+        f"{{}}-{{:<{col_widths['lines']}}} "
+        f"{{:<{col_widths['nest']}}} "
+        f"{{:<{col_widths['complex']}}} "
+        f"{{:<{col_widths['length']}}} "
+        f"{{:<{col_widths['params']}}}"
+    )
+
+
 def _format_table_row(
-    rel_path: Path, metric: FunctionMetrics, col_widths: dict[str, int]
+    metric: FunctionMetrics, col_widths: dict[str, int], row_template: str
 ) -> str:
     """Format a single table row."""
-    file_str = _truncate_string(str(rel_path), col_widths['file'] - 2)
+    file_str = _truncate_string(metric.rel_path, col_widths['file'] - 2)
     func_str = _truncate_string(metric.function_name, col_widths['function'] - 2)
     
-    return (
-        f"{format_priority(metric.priority_score):<{col_widths['priority']}} "
-        f"{file_str:<{col_widths['file']}} "
-        f"{func_str:<{col_widths['function']}} "
-        f"{metric.line_start}-{metric.line_end:<{col_widths['lines']}} "
-        f"{metric.max_nesting_level:<{col_widths['nest']}} "
-        f"{metric.cyclomatic_complexity:<{col_widths['complex']}} "
-        f"{metric.function_length:<{col_widths['length']}} "
-        f"{_format_parameter_string(metric):<{col_widths['params']}}"
+    return row_template.format(
+        format_priority(metric.priority_score),
+        file_str,
+        func_str,
+        metric.line_start,
+        metric.line_end,
+        metric.max_nesting_level,
+        metric.cyclomatic_complexity,
+        metric.function_length,
+        _format_parameter_string(metric),
     )
 
 
 def print_priority_table(top_metrics: list[FunctionMetrics], limit: int = 30) -> None:
-    """Print top priority functions in a tabular format."""
+    """Print top priority functions in a tabular format, written to stdout in one call."""
     if not top_metrics:
         return
 
-    project_root = Path(__file__).parent.parent
-    metrics_with_paths = _prepare_metrics_with_paths(top_metrics, limit, project_root)
-    col_widths = _calculate_column_widths(metrics_with_paths)
+    shown_metrics = top_metrics[:limit]
+    col_widths = _calculate_column_widths(shown_metrics)
     
     header = _format_table_header(col_widths)
+    row_template = _build_row_template(col_widths)
     separator = "=" * len(header)
-    print(f"\n{separator}")
-    print(header)
-    print(separator)
-
-    for rel_path, metric in metrics_with_paths:
-        print(_format_table_row(rel_path, metric, col_widths))
-
-    print(separator)
-    print(f"\nShowing top {min(limit, len(top_metrics))} functions by priority score")
-    print("Legend: Nest = Max nesting level, Complex = Cyclomatic complexity, Length = Lines of code, Params = Parameter count")
-
-
-def _extract_method_names_from_protocol(protocol_node: ast.ClassDef) -> set[str]:
-    """Extract method names from a Protocol class node."""
-    method_names = set()
-    for child in ast.walk(protocol_node):
-        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            method_names.add(child.name)
-    return method_names
-
-
-def _parse_file_safely(file_path: Path) -> ast.AST | None:
-    """Parse a Python file, returning None on error."""
-    try:
-        source_code = file_path.read_text(encoding="utf-8")
-        return ast.parse(source_code, filename=str(file_path))
-    except Exception:
-        return None
-
-
-def _collect_protocols_from_tree(tree: ast.AST) -> dict[str, set[str]]:
-    """Collect protocol signatures from a single AST tree."""
-    protocols: dict[str, set[str]] = {}
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef) and is_protocol_class(node, tree):
-            protocols[node.name] = _extract_method_names_from_protocol(node)
-    return protocols
-
-
-def collect_protocol_signatures(root_dir: Path) -> dict[str, set[str]]:
-    """Collect all Protocol class names and their method signatures across all files.
-    
-    Returns:
-        Dictionary mapping protocol class names to sets of method names.
-    """
-    protocol_signatures: dict[str, set[str]] = {}
-    
-    for py_file in find_python_files(root_dir):
-        tree = _parse_file_safely(py_file)
-        if tree is not None:
-            protocol_signatures.update(_collect_protocols_from_tree(tree))
-    
-    return protocol_signatures
+    lines = ["", separator, header, separator]
+    lines.extend(_format_table_row(metric, col_widths, row_template) for metric in shown_metrics)
+    lines.append(separator)
+    lines.append(f"\nShowing top {min(limit, len(top_metrics))} functions by priority score")
+    lines.append("Legend: Nest = Max nesting level, Complex = Cyclomatic complexity, Length = Lines of code, Params = Parameter count")
+    print("\n".join(lines))
 
 
 def _count_parameter_violations(metrics: list[FunctionMetrics]) -> int:
@@ -700,11 +1163,6 @@ def _count_parameter_violations(metrics: list[FunctionMetrics]) -> int:
     return sum(1 for m in metrics if m.parameter_violation > 0)
 
 
-def _count_low_mi(metrics: list[FunctionMetrics]) -> int:
-    """Count functions with low Maintainability Index (< 20)."""
-    return sum(1 for m in metrics if 0 < m.maintainability_index < 20)
-
-
 def _get_relative_path(file_path: str, project_root: Path) -> Path:
     """Get relative path from project root, falling back to absolute path if not possible."""
     try:
@@ -713,28 +1171,34 @@ def _get_relative_path(file_path: str, project_root: Path) -> Path:
         return Path(file_path)
 
 
-def print_summary(
-    all_metrics: list[FunctionMetrics],
-    regular_metrics: list[FunctionMetrics],
-    protocol_metrics: list[FunctionMetrics],
-) -> None:
+def print_summary(summary: dict) -> None:
     """Print summary statistics."""
-    summary = _build_summary_data(all_metrics, regular_metrics, protocol_metrics)
-    
     print(f"\nTotal functions analyzed: {summary['total_functions']}")
     print(f"  - Regular functions: {summary['regular_functions']}")
     print(f"  - Protocol/interface methods: {summary['protocol_methods']}")
-    print(f"Functions with nesting > 2: {summary['functions_with_nesting_violations']}")
-    print(f"Functions with complexity > 10: {summary['functions_with_high_complexity']}")
-    print(f"Functions with length > 50: {summary['functions_with_high_length']}")
+    print(
+        f"Functions with nesting > {MAX_NESTING_LEVEL}: "
+        f"{summary['functions_with_nesting_violations']}"
+    )
+    print(
+        f"Functions with complexity > {MAX_COMPLEXITY}: "
+        f"{summary['functions_with_high_complexity']}"
+    )
+    print(
+        f"Functions with length > {MAX_FUNCTION_LENGTH}: "
+        f"{summary['functions_with_high_length']}"
+    )
     print(
         f"Functions with too many parameters: {summary['functions_with_too_many_parameters']} "
         f"(regular) + {summary['protocol_methods_with_too_many_parameters']} (protocol)"
     )
-    print(f"Functions with low Maintainability Index (< 20): {summary['functions_with_low_maintainability_index']}")
+    print(
+        f"Functions with low Maintainability Index (< {MIN_MAINTAINABLE_MI}): "
+        f"{summary['functions_with_low_maintainability_index']}"
+    )
 
 
-def print_protocol_methods(protocol_metrics: list[FunctionMetrics], project_root: Path) -> None:
+def print_protocol_methods(protocol_metrics: list[FunctionMetrics]) -> None:
     """Print protocol methods with violations."""
     protocol_with_violations = [m for m in protocol_metrics if m.parameter_violation > 0]
     if not protocol_with_violations:
@@ -744,9 +1208,8 @@ def print_protocol_methods(protocol_metrics: list[FunctionMetrics], project_root
     print("PROTOCOL/INTERFACE METHODS (excluded from refactoring priorities)")
     print("=" * 80)
     
-    for m in sorted(protocol_with_violations, key=lambda x: (x.file_path, x.function_name)):
-        rel_path = _get_relative_path(m.file_path, project_root)
-        print(f"  {rel_path}::{m.function_name} ({m.parameter_count} params, {m.parameter_violation} over limit)")
+    for m in sorted(protocol_with_violations, key=attrgetter("file_path", "function_name")):
+        print(f"  {m.rel_path}::{m.function_name} ({m.parameter_count} params, {m.parameter_violation} over limit)")
     
     print("  Note: Protocol methods maintain interface contracts and cannot be refactored.")
 
@@ -758,101 +1221,109 @@ def format_parameter_info(metric: FunctionMetrics) -> tuple[str, int]:
         param_info += " + *args"
     if metric.has_kwargs:
         param_info += " + **kwargs"
-    max_allowed = 4 + (1 if metric.has_varargs else 0) + (1 if metric.has_kwargs else 0)
+    max_allowed = MAX_REGULAR_PARAMETERS + (1 if metric.has_varargs else 0) + (1 if metric.has_kwargs else 0)
     return param_info, max_allowed
 
 
-def _group_metrics_by_file(regular_metrics: list[FunctionMetrics]) -> dict[str, list[FunctionMetrics]]:
-    """Group metrics by file path."""
+def _group_metrics_by_file(
+    regular_metrics: list[FunctionMetrics],
+) -> tuple[dict[str, list[FunctionMetrics]], dict[str, float]]:
+    """Group metrics with a positive priority by file path, tracking each file's top score.
+
+    Returns:
+        Tuple of (file_groups, file_priorities), both keyed by file path.
+    """
     file_groups: dict[str, list[FunctionMetrics]] = {}
+    file_priorities: dict[str, float] = {}
     for metric in regular_metrics:
-        if metric.priority_score > 0:
-            file_groups.setdefault(metric.file_path, []).append(metric)
-    return file_groups
+        score = metric.priority_score
+        if score <= 0:
+            continue
+        file_path = metric.file_path
+        file_groups.setdefault(file_path, []).append(metric)
+        file_priorities[file_path] = max(file_priorities.get(file_path, score), score)
+    return file_groups, file_priorities
 
 
-def _format_mi_status(mi: float) -> str:
+def _format_mi_status(mi: float | None) -> str:
     """Format Maintainability Index status."""
+    if mi is None:
+        return "skipped"
     if mi == 0:
         return "N/A"
-    if mi < 10:
+    if mi < MIN_DIFFICULT_MI:
         return f"{mi:.1f} (very difficult)"
-    if mi < 20:
+    if mi < MIN_MAINTAINABLE_MI:
         return f"{mi:.1f} (difficult)"
     return f"{mi:.1f} (maintainable)"
 
 
-def _print_function_details(metric: FunctionMetrics) -> None:
-    """Print detailed information about a function metric."""
-    print(f"  Function: {metric.function_name} (lines {metric.line_start}-{metric.line_end})")
-    print(f"    Priority: {format_priority(metric.priority_score)} ({metric.priority_score:.1f})")
-    print(f"    Nesting: {metric.max_nesting_level} (max 2 allowed)")
-    print(f"    Complexity: {metric.cyclomatic_complexity} (recommended < 10)")
-    print(f"    Length: {metric.function_length} lines (recommended < 50)")
-    print(f"    Maintainability Index: {_format_mi_status(metric.maintainability_index)}")
+def _format_function_details(metric: FunctionMetrics) -> list[str]:
+    """Format detailed information about a function metric as output lines."""
     param_info, max_allowed = format_parameter_info(metric)
-    print(f"    Parameters: {param_info} (max {max_allowed} allowed: 4 regular + *args + **kwargs)")
+    lines = [
+        f"  Function: {metric.function_name} (lines {metric.line_start}-{metric.line_end})",
+        f"    Priority: {format_priority(metric.priority_score)} ({metric.priority_score:.1f})",
+        f"    Nesting: {metric.max_nesting_level} (max {MAX_NESTING_LEVEL} allowed)",
+        f"    Complexity: {metric.cyclomatic_complexity} (recommended < {MAX_COMPLEXITY})",
+        f"    Length: {metric.function_length} lines (recommended < {MAX_FUNCTION_LENGTH})",
+        f"    Maintainability Index: {_format_mi_status(metric.maintainability_index)}",
+        f"    Parameters: {param_info} "
+        f"(max {max_allowed} allowed: {MAX_REGULAR_PARAMETERS} regular + *args + **kwargs)",
+    ]
     if metric.parameter_violation > 0:
-        print(f"      ⚠️  {metric.parameter_violation} parameter(s) over limit")
-    print()
+        lines.append(f"      ⚠️  {metric.parameter_violation} parameter(s) over limit")
+    lines.append("")
+    return lines
 
 
-def _print_file_header(file_path: str, file_metrics: list[FunctionMetrics], project_root: Path) -> None:
-    """Print header for a file section."""
-    rel_path = Path(file_path).relative_to(project_root)
-    max_priority = max(m.priority_score for m in file_metrics)
-    print(f"\n{format_priority(max_priority)} {rel_path}")
-    print("-" * 80)
+def _format_file_header(rel_path: str, max_priority: float) -> list[str]:
+    """Format the header lines for a file section."""
+    return ["", f"{format_priority(max_priority)} {rel_path}", "-" * 80]
 
 
-def _print_file_metrics(file_metrics: list[FunctionMetrics]) -> None:
-    """Print metrics for a file."""
-    top_metrics = sorted(file_metrics, key=lambda m: m.priority_score, reverse=True)[:5]
+def _format_file_metrics(file_metrics: list[FunctionMetrics]) -> list[str]:
+    """Format the top metrics of a file as output lines."""
+    top_metrics = sorted(file_metrics, key=attrgetter("priority_score"), reverse=True)[:5]
+    lines: list[str] = []
     for metric in top_metrics:
         if metric.priority_score <= 0:
             continue
-        _print_function_details(metric)
+        lines.extend(_format_function_details(metric))
+    return lines
 
 
-def _get_file_priority(file_metrics: list[FunctionMetrics]) -> float:
-    """Get the maximum priority score for a file."""
-    return max(m.priority_score for m in file_metrics)
-
-
-def _sort_files_by_priority(
-    file_groups: dict[str, list[FunctionMetrics]]
-) -> list[tuple[str, list[FunctionMetrics]]]:
+def _sort_files_by_priority(file_priorities: dict[str, float]) -> list[str]:
     """Sort files by their highest priority function."""
-    return sorted(
-        file_groups.items(),
-        key=lambda item: _get_file_priority(item[1]),
-        reverse=True,
-    )
+    return sorted(file_priorities, key=file_priorities.__getitem__, reverse=True)
 
 
-def print_detailed_file_view(regular_metrics: list[FunctionMetrics], project_root: Path) -> None:
-    """Print detailed view grouped by file."""
-    file_groups = _group_metrics_by_file(regular_metrics)
-    sorted_files = _sort_files_by_priority(file_groups)
+def print_detailed_file_view(regular_metrics: list[FunctionMetrics]) -> None:
+    """Print detailed view grouped by file, written to stdout in one call."""
+    file_groups, file_priorities = _group_metrics_by_file(regular_metrics)
     
-    for file_path, file_metrics in sorted_files[:20]:
-        _print_file_header(file_path, file_metrics, project_root)
-        _print_file_metrics(file_metrics)
+    lines: list[str] = []
+    for file_path in _sort_files_by_priority(file_priorities)[:20]:
+        file_metrics = file_groups[file_path]
+        lines.extend(_format_file_header(file_metrics[0].rel_path, file_priorities[file_path]))
+        lines.extend(_format_file_metrics(file_metrics))
+    if lines:
+        print("\n".join(lines))
 
 
 def _has_nesting_violation(metric: FunctionMetrics) -> bool:
     """Check if metric has nesting violation."""
-    return metric.max_nesting_level > 2
+    return metric.max_nesting_level > MAX_NESTING_LEVEL
 
 
 def _has_complexity_violation(metric: FunctionMetrics) -> bool:
     """Check if metric has complexity violation."""
-    return metric.cyclomatic_complexity > 10
+    return metric.cyclomatic_complexity > MAX_COMPLEXITY
 
 
 def _has_length_violation(metric: FunctionMetrics) -> bool:
     """Check if metric has length violation."""
-    return metric.function_length > 50
+    return metric.function_length > MAX_FUNCTION_LENGTH
 
 
 def _has_parameter_violation(metric: FunctionMetrics) -> bool:
@@ -860,11 +1331,18 @@ def _has_parameter_violation(metric: FunctionMetrics) -> bool:
     return metric.parameter_violation > 0
 
 
+def _has_low_maintainability_index(metric: FunctionMetrics) -> bool:
+    """Check if metric has a low Maintainability Index; a skipped MI is not low."""
+    mi = metric.maintainability_index
+    return mi is not None and 0 < mi < MIN_MAINTAINABLE_MI
+
+
 _VIOLATION_CHECKERS: dict[str, callable] = {
     "nesting": _has_nesting_violation,
     "complexity": _has_complexity_violation,
     "length": _has_length_violation,
     "parameters": _has_parameter_violation,
+    "low_mi": _has_low_maintainability_index,
 }
 
 
@@ -876,22 +1354,31 @@ def _count_violations(metrics: list[FunctionMetrics], violation_type: str) -> in
     return sum(1 for m in metrics if checker(m))
 
 
+def _count_all_violations(metrics: list[FunctionMetrics]) -> dict[str, int]:
+    """Count the violations of every type."""
+    return {
+        violation_type: sum(map(checker, metrics))
+        for violation_type, checker in _VIOLATION_CHECKERS.items()
+    }
+
+
 def _build_summary_data(
     all_metrics: list[FunctionMetrics],
     regular_metrics: list[FunctionMetrics],
     protocol_metrics: list[FunctionMetrics],
 ) -> dict:
     """Build summary statistics dictionary."""
+    regular_violations = _count_all_violations(regular_metrics)
     return {
         "total_functions": len(all_metrics),
         "regular_functions": len(regular_metrics),
         "protocol_methods": len(protocol_metrics),
-        "functions_with_nesting_violations": _count_violations(regular_metrics, "nesting"),
-        "functions_with_high_complexity": _count_violations(regular_metrics, "complexity"),
-        "functions_with_high_length": _count_violations(regular_metrics, "length"),
-        "functions_with_too_many_parameters": _count_violations(regular_metrics, "parameters"),
+        "functions_with_nesting_violations": regular_violations["nesting"],
+        "functions_with_high_complexity": regular_violations["complexity"],
+        "functions_with_high_length": regular_violations["length"],
+        "functions_with_too_many_parameters": regular_violations["parameters"],
         "protocol_methods_with_too_many_parameters": _count_violations(protocol_metrics, "parameters"),
-        "functions_with_low_maintainability_index": _count_low_mi(regular_metrics),
+        "functions_with_low_maintainability_index": regular_violations["low_mi"],
     }
 
 
@@ -920,32 +1407,117 @@ def _should_include_metric(metric: FunctionMetrics) -> bool:
     return metric.priority_score > 0 or (metric.is_protocol_method and metric.parameter_violation > 0)
 
 
+def _dumps_ascii(value: Any) -> str:
+    """Serialize a value with 2-space indentation and non-ASCII characters escaped.
+
+    orjson is used when installed, but it writes non-ASCII characters as is, so such
+    values go through json, whose default ``ensure_ascii`` escapes them.
+    """
+    if ORJSON_AVAILABLE:
+        text = orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+        if text.isascii():
+            return text
+    return json.dumps(value, indent=2)
+
+
+def _dump_indented(value: Any, level: int) -> str:
+    """Serialize a value with 2-space indentation, nested ``level`` levels deep."""
+    # Newlines inside JSON strings are escaped, so every raw newline starts a new line
+    return _dumps_ascii(value).replace("\n", "\n" + "  " * level)
+
+
+def _iter_json_report(summary: dict, entries: Iterable[dict]) -> Iterator[str]:
+    """Yield the report document piece by piece, laid out like ``json.dump(indent=2)``."""
+    yield '{\n  "summary": '
+    yield _dump_indented(summary, 1)
+    yield ',\n  "functions": ['
+    separator = "\n    "
+    for entry in entries:
+        yield separator
+        yield _dump_indented(entry, 2)
+        separator = ",\n    "
+    yield "]" if separator == "\n    " else "\n  ]"
+    yield "\n}"
+
+
 def generate_json_report(
+    summary: dict,
     all_metrics: list[FunctionMetrics],
-    regular_metrics: list[FunctionMetrics],
-    protocol_metrics: list[FunctionMetrics],
     report_path: Path,
 ) -> None:
-    """Generate JSON report file."""
-    report_data = {
-        "summary": _build_summary_data(all_metrics, regular_metrics, protocol_metrics),
-        "functions": [
-            _metric_to_dict(m)
-            for m in all_metrics
-            if _should_include_metric(m)
-        ],
-    }
-    
-    with report_path.open("w") as f:
-        json.dump(report_data, f, indent=2)
+    """Generate JSON report file.
+
+    Entries are serialized and written one at a time instead of building the whole
+    report in memory first.
+    """
+    entries = (_metric_to_dict(m) for m in all_metrics if _should_include_metric(m))
+    with report_path.open("w", encoding="utf-8") as f:
+        f.writelines(_iter_json_report(summary, entries))
+
+
+def _positive_int(value: str) -> int:
+    """Parse a strictly positive integer command line value."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Measure code complexity and prioritize refactoring"
+    )
+    parser.add_argument(
+        "root_dir",
+        nargs="?",
+        type=Path,
+        default=PROJECT_ROOT / "src" / "mvg_departures",
+        help="Directory to analyze (default: src/mvg_departures)",
+    )
+    parser.add_argument(
+        "--no-mi",
+        action="store_true",
+        help=(
+            "Skip the Maintainability Index for a faster run; "
+            "the MI then adds no penalty to the priority score"
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="Number of worker processes (default: one per CPU; 1 analyzes in-process)",
+    )
+    return parser.parse_args()
+
+
+def _split_metrics(
+    all_metrics: list[FunctionMetrics],
+) -> tuple[list[FunctionMetrics], list[FunctionMetrics], list[FunctionMetrics]]:
+    """Split metrics into protocol methods and regular functions, keeping their order.
+
+    Returns:
+        Tuple of (protocol_metrics, regular_metrics, top_priority_metrics), where the
+        top priorities are the regular functions with a positive priority score.
+    """
+    protocol_metrics: list[FunctionMetrics] = []
+    regular_metrics: list[FunctionMetrics] = []
+    for m in all_metrics:
+        target = protocol_metrics if m.is_protocol_method else regular_metrics
+        target.append(m)
+    top_priority_metrics = [m for m in regular_metrics if m.priority_score > 0]
+    return protocol_metrics, regular_metrics, top_priority_metrics
 
 
 def main() -> None:
     """Main entry point."""
-    if len(sys.argv) > 1:
-        root_dir = Path(sys.argv[1])
-    else:
-        root_dir = Path(__file__).parent.parent / "src" / "mvg_departures"
+    args = parse_arguments()
+    root_dir = args.root_dir
+    options = AnalysisOptions(include_maintainability_index=not args.no_mi)
 
     if not root_dir.exists():
         print(f"Error: Directory {root_dir} does not exist", file=sys.stderr)
@@ -954,37 +1526,36 @@ def main() -> None:
     print(f"Analyzing Python files in: {root_dir}")
     print("=" * 80)
 
-    print("Collecting protocol signatures...")
-    protocol_signatures = collect_protocol_signatures(root_dir)
-
-    all_metrics: list[FunctionMetrics] = []
-    for py_file in find_python_files(root_dir):
-        metrics = analyze_file(py_file, protocol_signatures)
-        all_metrics.extend(metrics)
-
-    all_metrics.sort(key=lambda m: m.priority_score, reverse=True)
+    print("Analyzing files...")
+    cache_path = PROJECT_ROOT / CACHE_FILE_NAME
+    scope = CacheScope(root_dir, options)
+    cache = load_metrics_cache(cache_path, scope)
+    all_metrics, protocol_signatures, cache = analyze_files(
+        find_python_files(root_dir), scope, cache, args.jobs
+    )
+    save_metrics_cache(cache_path, scope, cache)
+    resolve_protocol_methods(all_metrics, protocol_signatures)
 
-    protocol_metrics = [m for m in all_metrics if m.is_protocol_method]
-    regular_metrics = [m for m in all_metrics if not m.is_protocol_method]
+    all_metrics.sort(key=attrgetter("priority_score"), reverse=True)
+    protocol_metrics, regular_metrics, top_priority_metrics = _split_metrics(all_metrics)
 
-    print_summary(all_metrics, regular_metrics, protocol_metrics)
+    summary = _build_summary_data(all_metrics, regular_metrics, protocol_metrics)
+    print_summary(summary)
 
-    project_root = Path(__file__).parent.parent
-    print_protocol_methods(protocol_metrics, project_root)
+    print_protocol_methods(protocol_metrics)
 
     print("\n" + "=" * 80)
     print("TOP REFACTORING PRIORITIES (TABULAR VIEW)")
     print("=" * 80)
-    top_priority_metrics = [m for m in regular_metrics if m.priority_score > 0]
     print_priority_table(top_priority_metrics, limit=30)
 
     print("\n" + "=" * 80)
     print("TOP REFACTORING PRIORITIES (DETAILED VIEW BY FILE)")
     print("=" * 80)
-    print_detailed_file_view(regular_metrics, project_root)
+    print_detailed_file_view(regular_metrics)
 
-    report_path = project_root / "complexity_report.json"
-    generate_json_report(all_metrics, regular_metrics, protocol_metrics, report_path)
+    report_path = PROJECT_ROOT / "complexity_report.json"
+    generate_json_report(summary, all_metrics, report_path)
     print(f"\nDetailed report saved to: {report_path}")
 
 
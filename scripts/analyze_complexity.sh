@@ -2,9 +2,10 @@
 # Shell script wrapper for complexity analysis tool
 #
 # Usage:
-#   ./scripts/analyze_complexity.sh [directory]
+#   ./scripts/analyze_complexity.sh [directory] [options...]
 #
-# If no directory is provided, defaults to src/mvg_departures
+# If no directory is provided, analyzes src/mvg_departures and scripts.
+# Options such as --jobs N or --no-mi are passed on to analyze_complexity.py.
 
 set -euo pipefail
 
@@ -20,17 +21,18 @@ source "$SCRIPT_DIR/common_env.sh"
 # Debug: show argument count and what we received
 echo "DEBUG: analyze_complexity.sh called with $# arguments: $*" >&2
 
-# Default to both src/mvg_departures and scripts if no argument provided
-# If argument is provided, use it; otherwise analyze both source and scripts
-if [[ $# -eq 0 ]]; then
+# Default to both src/mvg_departures and scripts if no directory provided
+# If a directory is provided, use it; otherwise analyze both source and scripts
+# Any further arguments are options for the analysis script
+if [[ $# -eq 0 || "$1" == -* ]]; then
     # Analyze both source code and scripts
     echo "Analyzing source code and scripts..."
-    run_python "$ANALYZE_SCRIPT" "$PROJECT_ROOT/src/mvg_departures" || exit $?
+    run_python "$ANALYZE_SCRIPT" "$PROJECT_ROOT/src/mvg_departures" "$@" || exit $?
     echo ""
     echo "=================================================================================="
     echo "SCRIPTS ANALYSIS"
     echo "=================================================================================="
-    run_python "$ANALYZE_SCRIPT" "$PROJECT_ROOT/scripts" || exit $?
+    run_python "$ANALYZE_SCRIPT" "$PROJECT_ROOT/scripts" "$@" || exit $?
     echo ""
     echo "=================================================================================="
     echo "DEAD CODE DETECTION (vulture)"
@@ -47,6 +49,7 @@ if [[ $# -eq 0 ]]; then
     exit 0
 else
     TARGET_DIR="${1}"
+    shift
 fi
 
 # Convert to absolute path if relative
@@ -67,5 +70,5 @@ if [[ ! -d "$TARGET_DIR" ]]; then
 fi
 
 # Run the analysis script (unbuffered output handled by run_python)
-run_python "$ANALYZE_SCRIPT" "$TARGET_DIR"
+run_python "$ANALYZE_SCRIPT" "$TARGET_DIR" "$@"
 
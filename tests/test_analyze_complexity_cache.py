@@ -0,0 +1,165 @@
+"""Tests for the per-file metrics cache of scripts/analyze_complexity.py.
+
+The script keeps its cache and report next to its own project root, so the end-to-end
+test runs a copy of it inside a temporary directory.
+"""
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+SCRIPT_PATH = Path(__file__).parent.parent / "scripts" / "analyze_complexity.py"
+
+# Nesting level 3 gives a positive priority score, so the function is always reported
+NESTED_SOURCE = """\
+def nested(items):
+    for item in items:
+        if item:
+            while item:
+                item -= 1
+    return items
+"""
+SIMPLE_SOURCE = "def simple():\n    return 1\n"
+
+
+@pytest.fixture(scope="module")
+def analyzer() -> ModuleType:
+    """Load the analysis script as a module."""
+    spec = importlib.util.spec_from_file_location("analyze_complexity", SCRIPT_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    # Dataclasses and pickle look the module up by name
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def analyzed_files(analyzer: ModuleType, monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    """Record the files that are actually analyzed instead of taken from the cache."""
+    calls: list[Path] = []
+    original = analyzer.analyze_file
+
+    def recording_analyze_file(file_path: Path, options: object) -> object:
+        calls.append(file_path)
+        return original(file_path, options)
+
+    monkeypatch.setattr(analyzer, "analyze_file", recording_analyze_file)
+    return calls
+
+
+def _write_tree(root: Path) -> None:
+    """Create a small package with one reported and one unremarkable function."""
+    package = root / "pkg"
+    package.mkdir(parents=True)
+    (package / "nested.py").write_text(NESTED_SOURCE, encoding="utf-8")
+    (package / "simple.py").write_text(SIMPLE_SOURCE, encoding="utf-8")
+
+
+def _bump_mtime(path: Path) -> None:
+    """Move the modification time forward by one second."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _run_cached(analyzer: ModuleType, root: Path, cache_path: Path) -> list[str]:
+    """Analyze a tree through the on-disk cache and return the analyzed function names."""
+    scope = analyzer.CacheScope(root, analyzer.DEFAULT_ANALYSIS_OPTIONS)
+    cache = analyzer.load_metrics_cache(cache_path, scope)
+    metrics, _signatures, cache = analyzer.analyze_files(
+        analyzer.find_python_files(root), scope, cache, jobs=1
+    )
+    analyzer.save_metrics_cache(cache_path, scope, cache)
+    return sorted(m.function_name for m in metrics)
+
+
+@pytest.fixture
+def cached_tree(
+    analyzer: ModuleType, analyzed_files: list[Path], tmp_path: Path
+) -> Callable[[], list[str]]:
+    """Return a function that reanalyzes a tree whose cache has been filled once."""
+    root = tmp_path / "src"
+    _write_tree(root)
+    cache_path = tmp_path / "cache.pkl"
+    _run_cached(analyzer, root, cache_path)
+    analyzed_files.clear()
+    return lambda: _run_cached(analyzer, root, cache_path)
+
+
+def test_second_run_of_script_reproduces_output(tmp_path: Path) -> None:
+    """Given a cold and a warm run of the script, when comparing them, then output is equal."""
+    script = tmp_path / "scripts" / "analyze_complexity.py"
+    script.parent.mkdir()
+    shutil.copy(SCRIPT_PATH, script)
+    _write_tree(tmp_path / "src")
+    command = [sys.executable, str(script), str(tmp_path / "src")]
+    report_path = tmp_path / "complexity_report.json"
+
+    cold = subprocess.run(command, capture_output=True, text=True, check=True, timeout=60)
+    cold_report = report_path.read_text(encoding="utf-8")
+    warm = subprocess.run(command, capture_output=True, text=True, check=True, timeout=60)
+
+    assert (tmp_path / ".complexity_cache.pkl").exists()
+    assert warm.stdout == cold.stdout
+    assert report_path.read_text(encoding="utf-8") == cold_report
+    assert '"function": "nested"' in cold_report
+
+
+def test_unchanged_files_are_reused(
+    cached_tree: Callable[[], list[str]], analyzed_files: list[Path]
+) -> None:
+    """Given a filled cache, when nothing changed, then no file is analyzed again."""
+    assert cached_tree() == ["nested", "simple"]
+    assert analyzed_files == []
+
+
+def test_touched_file_with_same_content_is_reused(
+    cached_tree: Callable[[], list[str]], analyzed_files: list[Path], tmp_path: Path
+) -> None:
+    """Given a file with a new mtime only, when reanalyzing, then its digest still matches."""
+    _bump_mtime(tmp_path / "src" / "pkg" / "simple.py")
+
+    assert cached_tree() == ["nested", "simple"]
+    assert analyzed_files == []
+
+
+def test_changed_content_is_reanalyzed(
+    cached_tree: Callable[[], list[str]], analyzed_files: list[Path], tmp_path: Path
+) -> None:
+    """Given an edited file of the same size, when reanalyzing, then its entry is replaced."""
+    simple = tmp_path / "src" / "pkg" / "simple.py"
+    simple.write_text(SIMPLE_SOURCE.replace("simple", "renamed"), encoding="utf-8")
+    _bump_mtime(simple)
+
+    assert cached_tree() == ["nested", "renamed"]
+    assert analyzed_files == [simple]
+
+
+def test_deleted_file_is_dropped(
+    cached_tree: Callable[[], list[str]], analyzed_files: list[Path], tmp_path: Path
+) -> None:
+    """Given a deleted file, when reanalyzing, then its cached metrics are not reported."""
+    (tmp_path / "src" / "pkg" / "simple.py").unlink()
+
+    assert cached_tree() == ["nested"]
+    assert analyzed_files == []
+
+
+def test_changed_fingerprint_discards_cache(
+    analyzer: ModuleType,
+    cached_tree: Callable[[], list[str]],
+    analyzed_files: list[Path],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Given a different analyzer fingerprint, when reanalyzing, then every file is analyzed."""
+    monkeypatch.setattr(analyzer, "_analyzer_fingerprint", lambda: ("other analyzer",))
+
+    assert cached_tree() == ["nested", "simple"]
+    assert len(analyzed_files) == 2